@@ -2,7 +2,7 @@ import asyncio
 import contextlib
 import json
 import logging
-import time
+import sys
 from dataclasses import dataclass
 from enum import Enum
 from urllib.parse import urljoin, urlencode
@@ -10,11 +10,28 @@ from typing import *
 
 import aiohttp
 
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 SECOND_MS = 1000
 
+# Engine.IO packet types (see https://github.com/socketio/engine.io-protocol/tree/v3)
+OPEN, CLOSE, PING, PONG, MESSAGE, UPGRADE, NOOP = range(7)
+
 logger = logging.getLogger(__name__)
 
 
+def _create_task(coro, name: str) -> asyncio.Task:
+    """Create a named background task, starting it eagerly where supported."""
+    if sys.version_info >= (3, 12):
+        return asyncio.Task(coro, eager_start=True, name=name)
+    return asyncio.create_task(coro, name=name)
+
+
 @dataclass
 class EngineIOPacket:
     """
@@ -32,10 +49,6 @@ class EngineIOPacket:
     type: Type
     data: str = ''
 
-    @classmethod
-    def parse(cls, data: str):
-        return cls(EngineIOPacket.Type(int(data[0])), data[1:])
-
     def encode(self):
         return '%d%s' % (self.type.value, self.data)
 
@@ -63,13 +76,16 @@ class EngineIO:
         self.url = url
         self.path = path
         self.query = query
+        # url, path and VERSION never change, so build the URL once
+        params = dict(query, EIO=self.VERSION, transport='websocket')
+        self._connection_url = urljoin(url, f'{path}/?{urlencode(params)}')
         self.session: Optional[aiohttp.ClientSession] = None
         self.socket: Optional[aiohttp.ClientWebSocketResponse] = None
         self.runner: Optional[asyncio.Task] = None
 
         self.ping_interval = 0
         self.ping_timeout = 0
-        self.last_ping = 0
+        self._ping_handle: Optional[asyncio.TimerHandle] = None
 
     @property
     def connected(self) -> bool:
@@ -79,8 +95,7 @@ class EngineIO:
     @property
     def connection_url(self) -> str:
         """Full connection URL"""
-        params = dict(self.query, EIO=self.VERSION, transport="websocket")
-        return urljoin(self.url, f'{self.path}/?{urlencode(params)}')
+        return self._connection_url
 
     async def connect(self):
         """Connect to server."""
@@ -92,21 +107,29 @@ class EngineIO:
             logger.debug('Connecting to %s', self.connection_url)
             self.socket = await self.session.ws_connect(self.connection_url)
 
-            packet = EngineIOPacket.parse(await self.socket.receive_str())
-            if packet.type is not EngineIOPacket.Type.OPEN:
-                raise RuntimeError('Unexpected packet: %s' % packet)
+            msg = await self.socket.receive()
+            if msg.type is not aiohttp.WSMsgType.TEXT:
+                raise RuntimeError('Unexpected WebSocket message: %s' % msg.type)
 
-            await self._on_packet(packet)
+            data = msg.data
+            if not data or ord(data[0]) - 48 != OPEN:
+                raise RuntimeError('Unexpected packet: %s' % data)
+
+            await self._on_packet(OPEN, data[1:])
 
         except:
             await self.session.close()
             self.session = None
             raise
 
-        self.runner = asyncio.create_task(self._run())
+        self.runner = _create_task(self._run(), name='engineio-runner')
 
     async def close(self):
         """Close connection to server."""
+        if self._ping_handle:
+            self._ping_handle.cancel()
+            self._ping_handle = None
+
         if self.runner:
             self.runner.cancel()
             with contextlib.suppress(asyncio.CancelledError):
@@ -123,70 +146,78 @@ class EngineIO:
         self.runner = None
 
     async def _run(self):
-        """Internal runner for consuming messages."""
+        """
+        Internal runner for consuming messages.
+
+        Pings are scheduled separately via the event loop (see _fire_ping),
+        so this loop just receives and dispatches with no timeout handling.
+        """
         logger.debug('Runner starting')
+        # Hoist per-iteration attribute lookups out of the loop
+        receive = self.socket.receive
+        on_packet = self._on_packet
         try:
             while True:
-                now = time.monotonic()
-                if self.ping_interval:
-                    if now > self.last_ping + self.ping_interval:
-                        await self.ping()
-
-                    timeout = self.ping_interval - (now - self.last_ping)
-                else:
-                    timeout = None
-
-                try:
-                    msg = await self.socket.receive(timeout)
-                except asyncio.TimeoutError:
-                    continue
+                msg = await receive()
 
                 if msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED):
                     break
                 elif msg.type != aiohttp.WSMsgType.TEXT:
                     logger.warning('Unexpected WebSocket message type: %s', msg.type)
+                elif not msg.data:
+                    logger.warning('Empty packet')
                 else:
-                    try:
-                        packet = EngineIOPacket.parse(msg.data)
-                    except ValueError as e:
-                        logger.warning('Failed to parse packet: %s', e)
-                        continue
-
-                    await self._on_packet(packet)
+                    await on_packet(ord(msg.data[0]) - 48, msg.data[1:])
         except Exception:
             logger.exception('Unhandled exception in runner')
         finally:
+            # No more pings once the connection is gone
+            if self._ping_handle:
+                self._ping_handle.cancel()
+                self._ping_handle = None
             logger.debug('Runner stopped')
 
-    async def _on_packet(self, packet: EngineIOPacket):
+    async def _on_packet(self, packet_type: int, data: str):
         """
         Handle Engine.IO packet.
 
-        :param packet: Decoded packet.
+        Branches are ordered by frequency: MESSAGE dominates, followed by
+        the ping/pong heartbeat.
+
+        :param packet_type: Packet type (see module constants).
+        :param data: Packet payload.
         """
-        logger.debug('> %s %s', packet.type.name, packet.data)
-        if packet.type is EngineIOPacket.Type.NOOP:
+        logger.debug('> %d %s', packet_type, data)
+        if packet_type == MESSAGE:
+            self.on_message(data)
+        elif packet_type == PING:
+            await self.send_packet(EngineIOPacket(EngineIOPacket.Type.PONG))
+        elif packet_type == PONG:
+            # TODO: Handle ping timeout
             pass
-        elif packet.type is EngineIOPacket.Type.OPEN:
-            handshake = json.loads(packet.data)
+        elif packet_type == NOOP:
+            pass
+        elif packet_type == OPEN:
+            handshake = _json_loads(data)
             self.sid = handshake['sid']
             self.ping_interval = handshake['pingInterval'] / SECOND_MS
             self.ping_timeout = handshake['pingTimeout'] / SECOND_MS
-        elif packet.type is EngineIOPacket.Type.CLOSE:
+            if self._ping_handle:
+                self._ping_handle.cancel()
+            if self.ping_interval:
+                self._ping_handle = asyncio.get_running_loop().call_later(
+                    self.ping_interval, self._fire_ping)
+        elif packet_type == CLOSE:
             self.sid = None
             self.ping_interval = None
             self.ping_timeout = None
-        elif packet.type is EngineIOPacket.Type.PING:
-            await self.send_packet(EngineIOPacket(EngineIOPacket.Type.PONG))
-        elif packet.type is EngineIOPacket.Type.PONG:
-            # TODO: Handle ping timeout
-            pass
-        elif packet.type is EngineIOPacket.Type.MESSAGE:
-            self.on_message(packet.data)
-        elif packet.type is EngineIOPacket.Type.UPGRADE:
-            self.on_upgrade(packet.data)
+            if self._ping_handle:
+                self._ping_handle.cancel()
+                self._ping_handle = None
+        elif packet_type == UPGRADE:
+            self.on_upgrade(data)
         else:
-            logger.warning('Unhandled packet type: %s', packet.type.name)
+            logger.warning('Unhandled packet type: %d', packet_type)
 
     @staticmethod
     def on_message(data: str):
@@ -206,10 +237,15 @@ class EngineIO:
         """
         pass
 
+    def _fire_ping(self):
+        """Send a PING and schedule the next one."""
+        _create_task(self.ping(), name='engineio-ping')
+        self._ping_handle = asyncio.get_running_loop().call_later(
+            self.ping_interval, self._fire_ping)
+
     async def ping(self):
         """Send PING to server."""
         await self.send_packet(EngineIOPacket(EngineIOPacket.Type.PING))
-        self.last_ping = time.monotonic()
 
     async def send_message(self, data: str):
         """
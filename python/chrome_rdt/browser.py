@@ -77,7 +77,8 @@ class BrowserProcess:
             logger.debug('Removing %s', self.temp_dir)
             while True:
                 try:
-                    shutil.rmtree(self.temp_dir)
+                    # Off-thread: a large user-data dir would block the loop
+                    await asyncio.to_thread(shutil.rmtree, self.temp_dir)
                 except FileNotFoundError:
                     break
                 except OSError as e:
@@ -96,7 +97,7 @@ class BrowserProcess:
         port_path = self.temp_dir / self.DEVTOOLS_ACTIVE_PORT_FILENAME
         while True:
             try:
-                contents = port_path.read_text()
+                contents = await asyncio.to_thread(port_path.read_text)
             except FileNotFoundError:
                 pass
             else:
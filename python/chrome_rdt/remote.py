@@ -1,17 +1,38 @@
 import asyncio
 import contextlib
-import itertools
+import functools
 import json
 import logging
+import sys
 
 import aiohttp
 import cdp
-from pyee import AsyncIOEventEmitter
 
 from chrome_rdt.typing import *
 
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
 logger = logging.getLogger(__name__)
 
+# Size of the in-flight request ring buffer (must be a power of two)
+_REQUEST_SLOTS = 4096
+
+
+def _create_task(coro, name: str) -> asyncio.Task:
+    """Create a named background task, starting it eagerly where supported."""
+    if sys.version_info >= (3, 12):
+        return asyncio.Task(coro, eager_start=True, name=name)
+    return asyncio.create_task(coro, name=name)
+
 
 class Client:
     """Chrome Remote Debugging client."""
@@ -19,11 +40,13 @@ class Client:
     DEFAULT_HOST = 'localhost'
     DEFAULT_PORT = 9222
 
-    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, *, loop: asyncio.AbstractEventLoop = None):
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None):
         self.host = host or self.DEFAULT_HOST
         self.port = port or self.DEFAULT_PORT
-        self.loop = loop or asyncio.get_event_loop()
-        self.http_session = aiohttp.ClientSession()
+        # Large read buffer so multi-megabyte CDP frames (DOM snapshots,
+        # screenshots) are read in as few recvs as possible
+        self.http_session = aiohttp.ClientSession(read_bufsize=2 ** 20)
+        self._version_url = f'http://{self.host}:{self.port:d}/json/version'
 
     async def __aenter__(self):
         return self
@@ -46,10 +69,8 @@ class Client:
         if not self.http_session:
             raise RuntimeError('Client has been disconnected')
 
-        version_url = f'http://{self.host}:{self.port:d}/json/version'
-
-        logger.debug('GET %s', version_url)
-        resp = await self.http_session.get(version_url)
+        logger.debug('GET %s', self._version_url)
+        resp = await self.http_session.get(self._version_url)
         resp.raise_for_status()
 
         return await resp.json()
@@ -88,7 +109,7 @@ class TargetError(Exception):
         return f'{self.message} (code: {self.code})'
 
 
-class Target(AsyncIOEventEmitter):
+class Target:
     """DevTools target."""
 
     @classmethod
@@ -106,14 +127,21 @@ class Target(AsyncIOEventEmitter):
         return target
 
     def __init__(self, client: Client, websocket: aiohttp.ClientWebSocketResponse, url: str):
-        super().__init__()
-
         self.client = client
         self.websocket = websocket
         self.url = url
         self._reader: Optional[asyncio.Task] = None
-        self._requests: Dict[int, asyncio.Future] = {}
-        self._request_id_counter = itertools.count()
+        self._emitter: Optional[asyncio.Task] = None
+        # Parsed events are handed off to _emit_loop so the reader can get
+        # back to the socket; bounded so event storms apply backpressure
+        self._event_queue: asyncio.Queue = asyncio.Queue(maxsize=1024)
+        # Request ids increase monotonically, so in-flight futures live in a
+        # ring buffer indexed by `id & (_REQUEST_SLOTS - 1)` rather than a dict
+        self._requests: List[Optional[asyncio.Future]] = [None] * _REQUEST_SLOTS
+        self._next_request_id = 0
+        self._listeners: Dict[str, List[Callable]] = {}
+        # method name -> frame template; only id and params vary per call
+        self._request_templates: Dict[str, str] = {}
 
     async def __aenter__(self):
         return self
@@ -124,45 +152,102 @@ class Target(AsyncIOEventEmitter):
     async def _connect(self):
         """Connect to socket and begin reading messages."""
         if not self._reader:
-            self._reader = asyncio.create_task(self._read())
+            self._reader = _create_task(self._read(), name='cdp-reader')
+
+        if not self._emitter:
+            self._emitter = _create_task(self._emit_loop(), name='cdp-emitter')
 
     async def _read(self):
         """Read messages from socket."""
+        # Per-message handling is inlined with hot attribute lookups hoisted
+        # out of the loop
+        receive = self.websocket.receive
+        requests = self._requests
+        queue_put = self._event_queue.put
+        parse_event = cdp.util.parse_json_event
+        text = aiohttp.WSMsgType.TEXT
+        binary = aiohttp.WSMsgType.BINARY
+        close_types = {aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.CLOSED}
+
         try:
             logger.debug('Enter Task._read for %s', self.url)
             while self.websocket:
-                await self._read_once()
+                msg = await receive()
+                if msg.type in close_types:
+                    await self.websocket.close()
+                    self.websocket = None
+                    break
+
+                if msg.type is not text and msg.type is not binary:
+                    logger.warning('Got unexpected message type: %s', msg.type)
+                    continue
+
+                # msg.data may be str or bytes; the parser takes both, so
+                # binary frames skip the UTF-8 decode round-trip
+                response = _json_loads(msg.data)
+                logger.debug('> %s', response)
+
+                if 'id' in response:
+                    slot = response['id'] & (_REQUEST_SLOTS - 1)
+                    future = requests[slot]
+                    requests[slot] = None
+                    error = response.get('error')
+                    if error:
+                        future.set_exception(TargetError(error['code'], error['message']))
+                    else:
+                        future.set_result(response['result'])
+                else:
+                    await queue_put((response['method'], parse_event(response)))
         except Exception:
             logger.exception('Unhandled exception in Task._read for %s', self.url)
         finally:
             logger.debug('Exit Task._read for %s', self.url)
 
-    async def _read_once(self):
-        """Read single message from socket."""
-        msg = await self.websocket.receive()
-        if msg.type in {aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.CLOSED}:
-            await self.websocket.close()
-            self.websocket = None
-            return
-
-        if msg.type is not aiohttp.WSMsgType.TEXT:
-            logger.warning('Got unexpected message type: %s', msg.type)
-            return
-
-        response = json.loads(msg.data)
-        logger.debug('> %s', response)
-
-        if 'id' in response:
-            error = response.get('error')
-            if error:
-                self._requests[response['id']].set_exception(
-                    TargetError(error['code'], error['message']))
-            else:
-                self._requests[response['id']].set_result(response['result'])
-        else:
-            event = cdp.util.parse_json_event(response)
+    async def _emit_loop(self):
+        """Dispatch queued events to listeners."""
+        while True:
+            method, event = await self._event_queue.get()
+            self.emit(method, event)
+
+    def on(self, method: str, listener: Callable = None):
+        """
+        Register an event listener.
+
+        May be used directly or as a decorator.
+
+        :param method: CDP method name (e.g. "Network.responseReceived").
+        :param listener: Event listener.
+        """
+        if listener is None:
+            return functools.partial(self.on, method)
+
+        self._listeners.setdefault(method, []).append(listener)
+        return listener
+
+    def off(self, method: str, listener: Callable):
+        """
+        Remove a previously registered event listener.
+
+        :param method: CDP method name listened for.
+        :param listener: Previously registered event listener.
+        """
+        self._listeners[method].remove(listener)
+
+    def emit(self, method: str, event):
+        """
+        Dispatch an event to registered listeners.
+
+        Plain callables run inline; coroutines returned by async listeners
+        are scheduled as tasks.
+
+        :param method: CDP method name.
+        :param event: Parsed CDP event.
+        """
+        for listener in tuple(self._listeners.get(method, ())):
             try:
-                self.emit(response['method'], event)
+                result = listener(event)
+                if asyncio.iscoroutine(result):
+                    _create_task(result, name='cdp-listener')
             except Exception:
                 logger.exception('Exception in event handler')
 
@@ -178,6 +263,12 @@ class Target(AsyncIOEventEmitter):
                 await self._reader
             self._reader = None
 
+        if self._emitter:
+            self._emitter.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._emitter
+            self._emitter = None
+
     T = TypeVar('T')
 
     async def __call__(self, method: Generator[JSONDict, JSONDict, T]) -> T:
@@ -192,13 +283,27 @@ class Target(AsyncIOEventEmitter):
             raise RuntimeError('Not connected')
 
         request = next(method)
-        request['id'] = next(self._request_id_counter)
+        request_id = self._next_request_id
+        self._next_request_id = request_id + 1
+        request['id'] = request_id
+
+        slot = request_id & (_REQUEST_SLOTS - 1)
+        if self._requests[slot] is not None:
+            raise RuntimeError('Too many requests in flight')
+
+        future_response = asyncio.get_running_loop().create_future()
+        self._requests[slot] = future_response
 
-        future_response = self.client.loop.create_future()
-        self._requests[request['id']] = future_response
+        method_name = request['method']
+        template = self._request_templates.get(method_name)
+        if template is None:
+            # CDP method names are plain identifiers, so splicing is safe
+            template = '{"id":%d,"method":"' + method_name + '","params":%s}'
+            self._request_templates[method_name] = template
 
         logger.debug('< %s', request)
-        await self.websocket.send_str(json.dumps(request))
+        await self.websocket.send_str(
+            template % (request_id, _json_dumps(request.get('params', {}))))
 
         response = await future_response
         try:
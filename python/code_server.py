@@ -5,58 +5,416 @@ HTTP server for hosting Adventure Land code.
 This can be used as an alternative to always running VSCode.
 """
 import argparse
+import asyncio
+import gzip
 import logging
-from pathlib import Path, PurePosixPath
+import mimetypes
+import multiprocessing
+import os
+import re
+import socket
+import time
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
 
 from aiohttp import web
+from multidict import CIMultiDict, CIMultiDictProxy
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None  # e.g. Windows
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 DEFAULT_HOST = '127.0.0.1'
 DEFAULT_PORT = 5500
 ALLOWED_ORIGIN = 'https://adventure.land'
 
-BASE_DIR = (Path(__file__) / '..' / '..').resolve()
-SOURCE_DIR = BASE_DIR / 'src'
+BASE_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), '..'))
+SOURCE_DIR = os.path.join(BASE_DIR, 'src')
+SOURCE_DIR_PREFIX = SOURCE_DIR + os.sep
+
+# Files up to this size are served from an in-memory cache
+SMALL_FILE_LIMIT = 256 * 1024  # bytes
+
+# Matches '..' path segments, NUL bytes and backslashes — none of which
+# appear in legitimate request paths
+_BAD_PATH = re.compile(r'(?:^|/)\.\.(?:/|$)|\x00|\\')
+
+# Bad requests are counted and logged in aggregate (see _count_bad_request)
+_bad_requests = 0
+_last_bad_request_log = 0.0
+
+# Headers common to every response, frozen and shared
+_BASE_HEADERS = CIMultiDictProxy(CIMultiDict([
+    ('Access-Control-Allow-Origin', ALLOWED_ORIGIN),
+    ('Cache-Control', 'no-cache'),  # Always revalidate (but 304s are fine)
+]))
 
 routes = web.RouteTableDef()
 
+# Request path -> pre-resolved file, built once at startup
+_ROUTE_TABLE: Dict[str, str] = {}
+
+# Request path -> in-memory copy of a small file
+_CACHE: Dict[str, 'CacheEntry'] = {}
+
+
+@dataclass
+class CacheEntry:
+    """In-memory copy of a small source file."""
+    path: str
+    body: bytes
+    gzip_body: Optional[bytes]
+    br_body: Optional[bytes]
+    etag: str
+    last_modified: str
+    mtime_ns: int
+    content_type: str
+
+
+def _build_route_table():
+    """
+    Pre-resolve every file under the source directory.
+
+    This makes serving a known file a single dict lookup with no pathlib
+    or filesystem traversal; files created after startup still go through
+    _resolve(). Small files are additionally loaded into memory so they
+    can be served without touching the file per request.
+    """
+    for dirpath, _dirnames, filenames in os.walk(SOURCE_DIR):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            rel = os.path.relpath(path, SOURCE_DIR).replace(os.sep, '/')
+            _ROUTE_TABLE[rel] = path
+            if os.path.getsize(path) <= SMALL_FILE_LIMIT:
+                _CACHE[rel] = _cache_entry(path)
+
+
+def _cache_entry(path: str, st: os.stat_result = None) -> CacheEntry:
+    """
+    Load a file into an in-memory cache entry.
+
+    :param path: File to load.
+    :param st: Stat result, if already available.
+    """
+    if st is None:
+        st = os.stat(path)
+    with open(path, 'rb') as f:
+        body = f.read()
+
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if _compressible(content_type):
+        gzip_body = gzip.compress(body, 6)
+        br_body = brotli.compress(body, quality=5) if brotli else None
+    else:
+        # Already-compressed formats (images, archives) aren't worth it
+        gzip_body = None
+        br_body = None
+
+    return CacheEntry(
+        path=path,
+        body=body,
+        gzip_body=gzip_body,
+        br_body=br_body,
+        etag=f'"{st.st_mtime_ns:x}-{st.st_size:x}"',
+        last_modified=formatdate(st.st_mtime, usegmt=True),
+        mtime_ns=st.st_mtime_ns,
+        content_type=content_type)
+
+
+def _compressible(content_type: str) -> bool:
+    """Is content of this type worth compressing?"""
+    return (content_type.startswith('text/')
+            or content_type in ('application/javascript', 'application/json'))
+
+
+def _count_bad_request():
+    """
+    Record a bad request, logging an aggregate at most once per second.
+
+    A log line per bad request would serialize the event loop on the
+    logging handler lock under a flood of junk paths.
+    """
+    global _bad_requests, _last_bad_request_log
+
+    _bad_requests += 1
+    now = time.monotonic()
+    if now - _last_bad_request_log >= 1.0:
+        logging.warning('%d bad request(s)', _bad_requests)
+        _bad_requests = 0
+        _last_bad_request_log = now
+
+
+# Raw request path -> resolved file, filled lazily by _resolve
+_RESOLVE_CACHE: Dict[str, str] = {}
+_RESOLVE_CACHE_LIMIT = 1024
+
+
+def _resolve(rel: str) -> Optional[str]:
+    """
+    Resolve a raw request path to a file under the source directory.
+
+    Successful resolutions are cached on the raw path string: the same
+    handful of source files is requested over and over, so repeat requests
+    skip the stat() chain entirely. Failures are not cached, so a file
+    requested before it exists isn't 404'd forever.
+
+    :param rel: Raw request path.
+    :return: Resolved path, or None if missing or outside the source directory.
+    """
+    full = _RESOLVE_CACHE.get(rel)
+    if full is not None:
+        return full
+
+    # realpath normalizes separators, '..' and symlinks, so the raw
+    # request path can be joined directly
+    full = os.path.realpath(os.path.join(SOURCE_DIR, rel))
+    # Path must be under source directory
+    if not full.startswith(SOURCE_DIR_PREFIX) or not os.path.isfile(full):
+        return None
+
+    if len(_RESOLVE_CACHE) < _RESOLVE_CACHE_LIMIT:
+        _RESOLVE_CACHE[rel] = full
+    return full
+
 
 @routes.get('/{path:.*}')
-def static(request: web.Request) -> web.FileResponse:
-    path = PurePosixPath(request.match_info['path'])
+async def static(request: web.Request) -> web.StreamResponse:
+    return await _serve(request, request.match_info['path'])
+
+
+def _make_handler(rel: str):
+    """Make a handler bound to a single pre-indexed file."""
+    async def handler(request: web.Request) -> web.StreamResponse:
+        return await _serve(request, rel)
+
+    return handler
+
+
+async def _serve(request: web.Request, rel: str) -> web.StreamResponse:
+    entry = _CACHE.get(rel)
+    if entry is not None:
+        return _serve_cached(request, rel, entry)
+
+    full_path = _ROUTE_TABLE.get(rel)
+    if full_path is None:
+        # Reject obviously bad paths before any filesystem work
+        if _BAD_PATH.search(rel):
+            _count_bad_request()
+            raise web.HTTPBadRequest()
+
+        # Not indexed at startup (e.g. newly created file); resolution
+        # stats each path component, so keep it off the event loop
+        full_path = await asyncio.to_thread(_resolve, rel)
+        if full_path is None:
+            raise web.HTTPNotFound()
 
     try:
-        full_path = (SOURCE_DIR / path).resolve(strict=True)
-        # Path must be under source directory
-        path = full_path.relative_to(SOURCE_DIR)
-    except ValueError as e:
-        logging.warning('Bad request: %s', e)
-        raise web.HTTPBadRequest()
+        st = os.stat(full_path)
     except FileNotFoundError:
+        # File deleted or renamed since it was indexed; drop the stale
+        # entries so a recreated file is picked up fresh
+        _ROUTE_TABLE.pop(rel, None)
+        _RESOLVE_CACHE.pop(rel, None)
         raise web.HTTPNotFound()
 
-    headers = {
-        'Access-Control-Allow-Origin': ALLOWED_ORIGIN,
-        'Cache-Control': 'no-cache',  # Always
-    }
+    etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+    headers = CIMultiDict(_BASE_HEADERS)
+    headers['ETag'] = etag
+    headers['Last-Modified'] = formatdate(st.st_mtime, usegmt=True)
+
+    if _not_modified(request, etag, st.st_mtime):
+        raise web.HTTPNotModified(headers=headers)
 
     return web.FileResponse(full_path, headers=headers)
 
 
+def _serve_cached(request: web.Request, rel: str, entry: CacheEntry) -> web.Response:
+    """
+    Serve a small file from the in-memory cache.
+
+    The cached copy is revalidated against the file's mtime with a single
+    stat(), so edits made while the server is running are picked up.
+
+    :param request: Incoming request.
+    :param rel: Request path (cache key).
+    :param entry: Cached file.
+    """
+    try:
+        st = os.stat(entry.path)
+    except FileNotFoundError:
+        # Cached file has been deleted or renamed
+        _CACHE.pop(rel, None)
+        _ROUTE_TABLE.pop(rel, None)
+        raise web.HTTPNotFound()
+
+    if st.st_mtime_ns != entry.mtime_ns:
+        entry = _cache_entry(entry.path, st)
+        _CACHE[rel] = entry
+
+    headers = CIMultiDict(_BASE_HEADERS)
+    headers['ETag'] = entry.etag
+    headers['Last-Modified'] = entry.last_modified
+    headers['Vary'] = 'Accept-Encoding'
+
+    if _not_modified(request, entry.etag, st.st_mtime):
+        raise web.HTTPNotModified(headers=headers)
+
+    accept_encoding = request.headers.get('Accept-Encoding', '')
+    if entry.br_body is not None and _accepts_encoding(accept_encoding, 'br'):
+        headers['Content-Encoding'] = 'br'
+        body = entry.br_body
+    elif entry.gzip_body is not None and _accepts_encoding(accept_encoding, 'gzip'):
+        headers['Content-Encoding'] = 'gzip'
+        body = entry.gzip_body
+    else:
+        body = entry.body
+
+    return web.Response(body=body, headers=headers, content_type=entry.content_type)
+
+
+def _accepts_encoding(accept_encoding: str, encoding: str) -> bool:
+    """
+    Does an Accept-Encoding header allow this encoding?
+
+    A token carrying q=0 is an explicit refusal, so a bare substring
+    test isn't enough (e.g. 'br;q=0, gzip').
+
+    :param accept_encoding: Raw Accept-Encoding header value.
+    :param encoding: Encoding name (e.g. "br").
+    """
+    for token in accept_encoding.split(','):
+        name, _, params = token.partition(';')
+        if name.strip() != encoding:
+            continue
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+
+    return False
+
+
+def _not_modified(request: web.Request, etag: str, mtime: float) -> bool:
+    """
+    Does the client already hold the current version of this file?
+
+    :param request: Incoming request.
+    :param etag: Current entity tag.
+    :param mtime: Current file modification time.
+    """
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        return if_none_match == etag
+
+    if_modified_since = request.headers.get('If-Modified-Since')
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except ValueError:
+            return False
+        return int(mtime) <= since
+
+    return False
+
+
 def parse_args() -> argparse.Namespace:
     """Parse command-line arguments."""
     parser = argparse.ArgumentParser()
     parser.add_argument('--host', default=DEFAULT_HOST)
-    parser.add_argument('--port', default=DEFAULT_PORT)
+    parser.add_argument('--port', default=DEFAULT_PORT, type=int)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of worker processes (default: 1)')
+    parser.add_argument('--verbose', action='store_true',
+                        help='log every request')
     return parser.parse_args()
 
 
+def serve(host: str, port: int, reuse_port: bool = False, verbose: bool = False):
+    """
+    Run a single server process.
+
+    :param host: Host to bind.
+    :param port: Port to bind.
+    :param reuse_port: Bind with SO_REUSEPORT (required for multiple workers).
+    :param verbose: Enable per-request access logging.
+    """
+    if uvloop:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+    _build_route_table()
+
+    app = web.Application()
+    # A concrete route per known file hits the router's plain-route fast
+    # path (dict lookup, no regex or match_info); the catch-all dynamic
+    # route below it covers files created after startup
+    for rel in _ROUTE_TABLE:
+        app.router.add_get('/' + rel, _make_handler(rel))
+    app.add_routes(routes)
+
+    try:
+        asyncio.run(_serve_forever(app, host, port, reuse_port, verbose))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _serve_forever(app: web.Application, host: str, port: int,
+                         reuse_port: bool, verbose: bool):
+    """Set up the app runner on a tuned listening socket and serve forever."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    # Small responses shouldn't wait out Nagle/delayed-ACK; accepted
+    # sockets inherit these listener options
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 256 * 1024)
+    if hasattr(socket, 'TCP_QUICKACK'):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+    sock.bind((host, port))
+
+    runner = web.AppRunner(
+        app,
+        # Formatting and writing an access-log line per request is a
+        # measurable cost on an otherwise trivial handler
+        access_log=logging.getLogger('aiohttp.access') if verbose else None)
+    await runner.setup()
+    try:
+        site = web.SockSite(runner, sock, backlog=2048)
+        await site.start()
+
+        logging.info('Serving on http://%s:%d', host, port)
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
 def main():
     logging.basicConfig(level=logging.INFO)
     args = parse_args()
 
-    app = web.Application()
-    app.add_routes(routes)
-    web.run_app(app, host=args.host, port=args.port)
+    if args.workers > 1:
+        # Each worker binds with SO_REUSEPORT; the kernel load-balances
+        # accept() across them
+        workers = [
+            multiprocessing.Process(target=serve, args=(args.host, args.port, True, args.verbose))
+            for _ in range(args.workers)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    else:
+        serve(args.host, args.port, verbose=args.verbose)
 
 
 if __name__ == '__main__':
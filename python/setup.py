@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Optional build for compiled packet-handling fast paths.
+
+The packet parsing and dispatch in `adventureland.engineio` and
+`adventureland.socketio` is pure Python string/dict work that Cython
+compiles well. If Cython is installed, running
+
+    python setup.py build_ext --inplace
+
+compiles those modules to C extensions which shadow the .py sources;
+without Cython (or without building) everything runs as plain Python.
+"""
+from setuptools import setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = cythonize(
+        ['adventureland/engineio.py', 'adventureland/socketio.py'],
+        compiler_directives={'language_level': '3'})
+
+setup(
+    name='adventureland',
+    packages=['adventureland', 'chrome_rdt'],
+    ext_modules=ext_modules,
+)